@@ -37,7 +37,7 @@ def main():
         logger.info(f"Features output: {output_path}")
         
         logger.info("Loading data...")
-        commits_df = pd.read_csv(commits_path)
+        commits_df = pd.read_parquet(commits_path) if commits_path.endswith('.parquet') else pd.read_csv(commits_path)
         labels_df = pd.read_csv(labels_path)
         
         logger.info(f"Loaded {len(commits_df)} commits")
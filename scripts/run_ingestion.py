@@ -1,11 +1,13 @@
-
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import os
+import queue
 import logging
-from src.ingestion.git_extractor import GitExtractor
+from concurrent.futures import ThreadPoolExecutor
+from src.ingestion.git_extractor import GitExtractor, CommitStatistics, commits_to_frame
 from src.ingestion.db_loader import DatabaseLoader
 from src.utils.config_loader import ConfigLoader
 
@@ -13,12 +15,82 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('logs/ingestion.log'),
+        logging.FileHandler('logs/ingestion.log', delay=True),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
 
+QUEUE_MAXSIZE = 4
+FETCH_FAILED = object()
+
+def produce(batches, queues):
+    sentinel = FETCH_FAILED
+    try:
+        for batch in batches:
+            for q in queues:
+                q.put(batch)
+        sentinel = None
+    finally:
+        for q in queues:
+            q.put(sentinel)
+
+def consume(q, handler):
+    finished = False
+    
+    def batches():
+        nonlocal finished
+        while True:
+            batch = q.get()
+            if batch is None or batch is FETCH_FAILED:
+                finished = True
+                if batch is FETCH_FAILED:
+                    raise RuntimeError("Commit extraction failed, discarding partial output")
+                return
+            yield batch
+    
+    try:
+        return handler(batches())
+    finally:
+        while not finished:
+            batch = q.get()
+            finished = batch is None or batch is FETCH_FAILED
+
+def write_output(extractor, batches, output_path):
+    root, ext = os.path.splitext(output_path)
+    partial_path = f"{root}.partial{ext}"
+    
+    try:
+        extractor.save(batches, partial_path)
+    except Exception:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    
+    os.replace(partial_path, output_path)
+
+def load_batches(db_loader, batches):
+    loaded = 0
+    with db_loader.session() as conn:
+        db_loader.create_table_if_not_exists(conn=conn)
+        for batch in batches:
+            loaded += db_loader.load_dataframe(commits_to_frame(batch), if_exists='append', conn=conn) or 0
+    return loaded, db_loader.get_record_count()
+
+def connect_database(config_loader):
+    try:
+        db_url = config_loader.get_database_url()
+        logger.info("Attempting to load data into PostgreSQL...")
+        
+        db_loader = DatabaseLoader(db_url)
+        db_loader.connect()
+        return db_loader
+    
+    except Exception as e:
+        logger.warning(f"Database loading skipped: {e}")
+        logger.info("This is normal if PostgreSQL is not set up yet (Phase 5)")
+        return None
+
 def main():
     logger.info("=" * 70)
     logger.info("STARTING DATA INGESTION PIPELINE")
@@ -39,18 +111,40 @@ def main():
         logger.info(f"Output path: {output_path}")
         
         extractor = GitExtractor()
+        db_loader = connect_database(config_loader)
+        
+        output_queue = queue.Queue(maxsize=QUEUE_MAXSIZE)
+        db_queue = queue.Queue(maxsize=QUEUE_MAXSIZE) if db_loader else None
+        queues = [q for q in (output_queue, db_queue) if q is not None]
         
-        logger.info("Extracting commits from GitHub...")
-        df = extractor.extract_commits(
+        statistics = CommitStatistics()
+        batches = extractor.iter_commit_batches(
             repo_owner=repo_owner,
             repo_name=repo_name,
             max_commits=max_commits
         )
         
-        logger.info("Saving to CSV...")
-        extractor.save_to_csv(df, output_path)
+        logger.info(f"Extracting commits from GitHub and streaming to {output_path}...")
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                writer = executor.submit(consume, output_queue, lambda b: write_output(extractor, statistics.track(b), output_path))
+                loader = executor.submit(consume, db_queue, lambda b: load_batches(db_loader, b)) if db_loader else None
+                fetcher = executor.submit(produce, batches, queues)
+                
+                fetcher.result()
+                writer.result()
+                
+                if loader is not None:
+                    try:
+                        loaded, count = loader.result()
+                        logger.info(f"Loaded {loaded} new records into PostgreSQL")
+                        logger.info(f"Total records in database: {count}")
+                    except Exception as e:
+                        logger.warning(f"Database loading failed: {e}")
+        finally:
+            extractor.close()
         
-        stats = extractor.get_statistics(df)
+        stats = statistics.to_dict()
         logger.info("=" * 70)
         logger.info("EXTRACTION STATISTICS")
         logger.info("=" * 70)
@@ -61,23 +155,8 @@ def main():
         logger.info(f"Avg lines added: {stats['avg_lines_added']:.2f}")
         logger.info(f"Avg lines deleted: {stats['avg_lines_deleted']:.2f}")
         
-        try:
-            db_url = config_loader.get_database_url()
-            logger.info("Attempting to load data into PostgreSQL...")
-            
-            db_loader = DatabaseLoader(db_url)
-            db_loader.connect()
-            db_loader.create_table_if_not_exists()
-            db_loader.load_dataframe(df, if_exists='append')
-            
-            count = db_loader.get_record_count()
-            logger.info(f"Total records in database: {count}")
-            
+        if db_loader:
             db_loader.close()
-            
-        except Exception as e:
-            logger.warning(f"Database loading skipped: {e}")
-            logger.info("This is normal if PostgreSQL is not set up yet (Phase 5)")
         
         logger.info("=" * 70)
         logger.info("✅ DATA INGESTION COMPLETE")
@@ -88,4 +167,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -40,7 +40,7 @@ def main():
         logger.info(f"Bug keywords: {', '.join(bug_keywords)}")
         
         logger.info("Loading commits data...")
-        commits_df = pd.read_csv(input_path)
+        commits_df = pd.read_parquet(input_path) if input_path.endswith('.parquet') else pd.read_csv(input_path)
         logger.info(f"Loaded {len(commits_df)} commits")
         
         generator = LabelGenerator(bug_keywords=bug_keywords)
@@ -1,8 +1,15 @@
 
+import io
+import time
 import logging
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
-from typing import Optional
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.engine import Connection
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+from src.ingestion.git_extractor import COMMIT_DTYPES
 
 logging.basicConfig(
     level=logging.INFO,
@@ -10,16 +17,89 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MAX_BIND_PARAMETERS = 65535
+
+AUTOTUNE_MIN_ROWS = 50_000
+AUTOTUNE_BATCH_SIZES = (500, 2000, 8000)
+AUTOTUNE_TRIAL_ROWS = max(AUTOTUNE_BATCH_SIZES)
+
+PSYCOPG2_ENGINE_OPTIONS = {
+    'executemany_mode': 'values_plus_batch',
+    'insertmanyvalues_page_size': 1000,
+    'executemany_batch_page_size': 500
+}
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    dtypes = {}
+    
+    for column, dtype in COMMIT_DTYPES.items():
+        if (
+            column not in df.columns
+            or not pd.api.types.is_integer_dtype(df[column])
+            or df[column].dtype == dtype
+        ):
+            continue
+        
+        limits = np.iinfo(dtype)
+        values = df[column]
+        if values.min() < limits.min or values.max() > limits.max:
+            raise ValueError(
+                f"Column '{column}' has values outside the {dtype} range "
+                f"[{limits.min}, {limits.max}]"
+            )
+        dtypes[column] = dtype
+    
+    return df.astype(dtypes) if dtypes else df
+
+def _csv_field(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+class CsvRowStream(io.TextIOBase):
+    
+    def __init__(self, rows: Iterator[Sequence]):
+        self._rows = rows
+        self._buffer = io.StringIO()
+    
+    def readable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> str:
+        while size < 0 or self._buffer.tell() < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._buffer.write(",".join(map(_csv_field, row)) + "\n")
+        
+        data = self._buffer.getvalue()
+        if 0 <= size < len(data):
+            data, rest = data[:size], data[size:]
+        else:
+            rest = ''
+        
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffer.write(rest)
+        return data
+
 class DatabaseLoader:
     
     def __init__(self, database_url: str):
         self.database_url = database_url
         self.engine = None
+        self._optimal_batch: Optional[int] = None
         logger.info("DatabaseLoader initialized")
     
     def connect(self):
         try:
-            self.engine = create_engine(self.database_url)
+            engine_options = {'pool_pre_ping': True}
+            if make_url(self.database_url).get_driver_name() == 'psycopg2':
+                engine_options.update(PSYCOPG2_ENGINE_OPTIONS)
+            
+            self.engine = create_engine(self.database_url, **engine_options)
             with self.engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
             logger.info("Database connection established")
@@ -27,28 +107,64 @@ class DatabaseLoader:
             logger.error(f"Failed to connect to database: {e}")
             raise
     
-    def create_table_if_not_exists(self, table_name: str = "raw_commits"):
+    @contextmanager
+    def session(self) -> Iterator[Connection]:
+        if self.engine is None:
+            raise RuntimeError("Database not connected. Call connect() first.")
+        
+        with self.engine.connect() as conn:
+            with conn.begin():
+                yield conn
+    
+    @contextmanager
+    def _connection(self, conn: Optional[Connection] = None) -> Iterator[Connection]:
+        if conn is not None:
+            yield conn
+            return
+        
+        with self.session() as conn:
+            yield conn
+    
+    @contextmanager
+    def _dbapi_connection(self, conn: Optional[Connection] = None):
+        if conn is not None:
+            yield conn.connection
+            return
+        
+        raw_conn = self.engine.raw_connection()
+        try:
+            yield raw_conn
+            raw_conn.commit()
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            raw_conn.close()
+    
+    def create_table_if_not_exists(
+        self,
+        table_name: str = "raw_commits",
+        conn: Optional[Connection] = None
+    ):
         create_table_sql = f"""
         CREATE TABLE IF NOT EXISTS {table_name} (
-            id SERIAL PRIMARY KEY,
-            commit_hash VARCHAR(40) UNIQUE NOT NULL,
+            commit_hash VARCHAR(40) PRIMARY KEY,
             author VARCHAR(255),
             author_name VARCHAR(255),
             timestamp TIMESTAMP,
             message TEXT,
-            files_changed INTEGER,
-            lines_added INTEGER,
-            lines_deleted INTEGER,
-            total_changes INTEGER,
+            files_changed INTEGER NOT NULL,
+            lines_added INTEGER NOT NULL,
+            lines_deleted INTEGER NOT NULL,
+            total_changes INTEGER NOT NULL,
             extracted_at TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """
         
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 conn.execute(text(create_table_sql))
-                conn.commit()
             logger.info(f"Table '{table_name}' ensured to exist")
         except Exception as e:
             logger.error(f"Failed to create table: {e}")
@@ -58,18 +174,63 @@ class DatabaseLoader:
         self,
         df: pd.DataFrame,
         table_name: str = "raw_commits",
-        if_exists: str = "append"
+        if_exists: str = "append",
+        conflict_column: Optional[str] = "commit_hash",
+        conn: Optional[Connection] = None,
+        bulk: bool = False
     ):
         if self.engine is None:
             raise RuntimeError("Database not connected. Call connect() first.")
         
+        df = downcast_numeric(df)
+        
+        if bulk:
+            return self.bulk_load(df, table_name, conn)
+        
+        if conflict_column not in df.columns:
+            conflict_column = None
+        
+        if self.engine.dialect.name == 'postgresql' and if_exists == 'append':
+            try:
+                rows_loaded = self._load_in_batches(
+                    df,
+                    lambda batch, conn: self._copy_to_postgres(batch, table_name, conflict_column, conn),
+                    conn
+                )
+                logger.info(
+                    f"Successfully copied {rows_loaded} records into '{table_name}' "
+                    f"({len(df) - rows_loaded} duplicates skipped)"
+                )
+                return rows_loaded
+            except Exception as e:
+                logger.error(f"Failed to copy data: {e}")
+                raise
+        
+        chunksize = max(1, MAX_BIND_PARAMETERS // max(1, len(df.columns)))
+        
         try:
-            rows_loaded = df.to_sql(
-                table_name,
-                self.engine,
-                if_exists=if_exists,
-                index=False
-            )
+            if if_exists == 'append':
+                rows_loaded = self._load_in_batches(
+                    df,
+                    lambda batch, conn: batch.to_sql(
+                        table_name,
+                        conn,
+                        if_exists='append',
+                        index=False,
+                        method='multi',
+                        chunksize=min(chunksize, len(batch))
+                    ) or 0,
+                    conn
+                )
+            else:
+                rows_loaded = df.to_sql(
+                    table_name,
+                    conn if conn is not None else self.engine,
+                    if_exists=if_exists,
+                    index=False,
+                    method='multi',
+                    chunksize=chunksize
+                )
             
             logger.info(f"Successfully loaded {len(df)} records into '{table_name}'")
             return rows_loaded
@@ -78,14 +239,160 @@ class DatabaseLoader:
             logger.error(f"Failed to load data: {e}")
             raise
     
-    def get_record_count(self, table_name: str = "raw_commits") -> int:
+    def _load_in_batches(
+        self,
+        df: pd.DataFrame,
+        write_batch: Callable[[pd.DataFrame, Connection], int],
+        conn: Optional[Connection] = None
+    ) -> int:
+        rows_loaded = 0
+        offset = 0
+        
+        with self._connection(conn) as conn:
+            if self._optimal_batch is None and len(df) > AUTOTUNE_MIN_ROWS:
+                rows_loaded, offset = self._autotune_batch_size(df, write_batch, conn)
+            
+            batch_size = self._optimal_batch or max(1, len(df))
+            for start in range(offset, len(df), batch_size):
+                rows_loaded += write_batch(df.iloc[start:start + batch_size], conn)
+        
+        return rows_loaded
+    
+    def _autotune_batch_size(
+        self,
+        df: pd.DataFrame,
+        write_batch: Callable[[pd.DataFrame, Connection], int],
+        conn: Connection
+    ) -> Tuple[int, int]:
+        rows_loaded = 0
+        timings = {}
+        
+        for i, batch_size in enumerate(AUTOTUNE_BATCH_SIZES):
+            trial = df.iloc[i * AUTOTUNE_TRIAL_ROWS:(i + 1) * AUTOTUNE_TRIAL_ROWS]
+            
+            started = time.perf_counter()
+            for start in range(0, len(trial), batch_size):
+                rows_loaded += write_batch(trial.iloc[start:start + batch_size], conn)
+            timings[batch_size] = time.perf_counter() - started
+        
+        self._optimal_batch = min(timings, key=timings.get)
+        logger.info(
+            f"Selected batch size {self._optimal_batch} "
+            f"(timings: {', '.join(f'{size}={secs:.3f}s' for size, secs in timings.items())})"
+        )
+        
+        return rows_loaded, len(AUTOTUNE_BATCH_SIZES) * AUTOTUNE_TRIAL_ROWS
+    
+    def bulk_load(
+        self,
+        df: pd.DataFrame,
+        table_name: str = "raw_commits",
+        conn: Optional[Connection] = None
+    ) -> int:
+        if self.engine is None:
+            raise RuntimeError("Database not connected. Call connect() first.")
+        if self.engine.dialect.name != 'postgresql':
+            raise RuntimeError("bulk_load requires a PostgreSQL database")
+        
+        try:
+            with self._connection(conn) as conn:
+                constraint, constraint_type = self._commit_hash_constraint(conn, table_name)
+                
+                conn.execute(text(f'ALTER TABLE {table_name} DROP CONSTRAINT "{constraint}"'))
+                rows_loaded = self._copy_to_postgres(df, table_name, conn=conn)
+                conn.execute(text(
+                    f'ALTER TABLE {table_name} ADD CONSTRAINT "{constraint}" {constraint_type} (commit_hash)'
+                ))
+            
+            logger.info(f"Bulk loaded {rows_loaded} records into '{table_name}'")
+            return rows_loaded
+        
+        except Exception as e:
+            logger.error(f"Failed to bulk load data: {e}")
+            raise
+    
+    def _commit_hash_constraint(self, conn: Connection, table_name: str) -> Tuple[str, str]:
+        row = conn.execute(text("""
+            SELECT con.conname, CAST(con.contype AS TEXT)
+            FROM pg_constraint con
+            JOIN pg_attribute att
+              ON att.attrelid = con.conrelid AND att.attnum = con.conkey[1]
+            WHERE con.conrelid = CAST(:table_name AS REGCLASS)
+              AND con.contype IN ('p', 'u')
+              AND array_length(con.conkey, 1) = 1
+              AND att.attname = 'commit_hash'
+            ORDER BY con.contype
+        """), {"table_name": table_name}).first()
+        
+        if row is None:
+            raise RuntimeError(
+                f"Table '{table_name}' has no primary key or unique constraint on commit_hash; "
+                f"refusing to bulk load"
+            )
+        
+        constraint, contype = row
+        return constraint, "PRIMARY KEY" if contype == 'p' else "UNIQUE"
+    
+    def _copy_to_postgres(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        conflict_column: Optional[str] = None,
+        conn: Optional[Connection] = None
+    ) -> int:
+        columns = ", ".join(df.columns)
+        staging_table = f"{table_name}_staging"
+        copy_target = staging_table if conflict_column else table_name
+        
+        with self._dbapi_connection(conn) as raw_conn:
+            cursor = raw_conn.cursor()
+            
+            if conflict_column:
+                cursor.execute(
+                    f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS "
+                    f"SELECT {columns} FROM {table_name} WITH NO DATA"
+                )
+            
+            cursor.copy_expert(
+                f"COPY {copy_target} ({columns}) FROM STDIN WITH CSV",
+                CsvRowStream(self._iter_rows(df))
+            )
+            rows_loaded = len(df)
+            
+            if conflict_column:
+                cursor.execute(
+                    f"INSERT INTO {table_name} ({columns}) "
+                    f"SELECT {columns} FROM {staging_table} "
+                    f"ON CONFLICT ({conflict_column}) DO NOTHING"
+                )
+                rows_loaded = cursor.rowcount
+                cursor.execute(f"DROP TABLE {staging_table}")
+            
+            cursor.close()
+        
+        return rows_loaded
+    
+    @staticmethod
+    def _iter_rows(df: pd.DataFrame) -> Iterator[list]:
+        for row in df.itertuples(index=False, name=None):
+            yield [None if pd.isna(value) else value for value in row]
+    
+    def get_record_count(
+        self,
+        table_name: str = "raw_commits",
+        conn: Optional[Connection] = None
+    ) -> int:
+        shared = conn is not None
+        
         try:
-            with self.engine.connect() as conn:
+            with self._connection(conn) as conn:
                 result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
                 count = result.scalar()
             return count
         except Exception as e:
             logger.error(f"Failed to get record count: {e}")
+            if shared:
+                raise
             return 0
     
     def close(self):
@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ETAG_CACHE_PATH = ".cache/git_etags.sqlite"
+CACHE_FORMAT_VERSION = 1
+
+class ETagCache:
+    
+    def __init__(self, path: str = DEFAULT_ETAG_CACHE_PATH):
+        self.path = path
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_FORMAT_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS etags")
+            self.conn.execute(f"PRAGMA user_version = {CACHE_FORMAT_VERSION}")
+        
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS etags (sha TEXT PRIMARY KEY, etag TEXT, payload BLOB)"
+        )
+        self.conn.commit()
+        logger.info(f"ETag cache opened at {path}")
+    
+    def get(self, sha: str) -> Optional[Tuple[str, bytes]]:
+        row = self.conn.execute(
+            "SELECT etag, payload FROM etags WHERE sha = ?", (sha,)
+        ).fetchone()
+        
+        if row is None:
+            return None
+        
+        etag, payload = row
+        return etag, bytes(payload)
+    
+    def put(self, sha: str, etag: str, payload: bytes):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO etags (sha, etag, payload) VALUES (?, ?, ?)",
+            (sha, etag, payload)
+        )
+    
+    def commit(self):
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -1,10 +1,19 @@
 
 import os
+import time
+import random
+import asyncio
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional
-from github import Github, Auth, GithubException
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple, Union
+import aiohttp
+import orjson
+import numpy as np
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.ingestion.etag_cache import ETagCache, DEFAULT_ETAG_CACHE_PATH
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,25 +21,223 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = f"{GITHUB_API_URL}/graphql"
+GRAPHQL_PAGE_SIZE = 100
+REST_PAGE_SIZE = 100
+MAX_CONCURRENT_REQUESTS = 64
+MAX_RETRIES = 5
+RETRY_STATUSES = (403, 429)
+DEFAULT_BATCH_SIZE = 1000
+
+COMMIT_COLUMNS = (
+    'commit_hash', 'author', 'author_name', 'timestamp', 'message',
+    'files_changed', 'lines_added', 'lines_deleted', 'total_changes',
+    'extracted_at',
+)
+
+COMMIT_DTYPES = {
+    'files_changed': 'int32',
+    'lines_added': 'int32',
+    'lines_deleted': 'int32',
+    'total_changes': 'int32',
+}
+
+def commits_to_frame(records: List[Dict]) -> pd.DataFrame:
+    return pd.DataFrame.from_records(records, columns=COMMIT_COLUMNS).astype(COMMIT_DTYPES)
+
+def commit_arrow_schema():
+    import pyarrow as pa
+    
+    fields = []
+    for column in COMMIT_COLUMNS:
+        if column in COMMIT_DTYPES:
+            field_type = pa.from_numpy_dtype(np.dtype(COMMIT_DTYPES[column]))
+        elif column == 'timestamp':
+            field_type = pa.timestamp('us', tz='UTC')
+        elif column == 'extracted_at':
+            field_type = pa.timestamp('us')
+        else:
+            field_type = pa.string()
+        fields.append(pa.field(column, field_type))
+    
+    return pa.schema(fields)
+
+CSV_WRITE_BUFFER_SIZE = 1 << 20
+CSV_HEADER = ",".join(COMMIT_COLUMNS) + "\n"
+CSV_ROW_FORMAT = '%s,%s,%s,%s,%s,%d,%d,%d,%d,%s\n'
+
+def parse_github_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+def _csv_quote(value: Optional[str]) -> str:
+    if value is None:
+        return ''
+    return '"' + value.replace('"', '""') + '"'
+
+def format_commit_row(commit: Dict) -> str:
+    timestamp = commit['timestamp']
+    extracted_at = commit.get('extracted_at')
+    
+    return CSV_ROW_FORMAT % (
+        commit['commit_hash'],
+        _csv_quote(commit['author']),
+        _csv_quote(commit['author_name']),
+        '' if timestamp is None else timestamp,
+        _csv_quote(commit['message']),
+        commit['files_changed'],
+        commit['lines_added'],
+        commit['lines_deleted'],
+        commit['total_changes'],
+        '' if extracted_at is None else extracted_at
+    )
+
+COMMIT_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $ref: String!, $first: Int!, $cursor: String) {
+  rateLimit { remaining resetAt }
+  repository(owner: $owner, name: $name) {
+    ref(qualifiedName: $ref) {
+      target {
+        ... on Commit {
+          history(first: $first, after: $cursor) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              message
+              additions
+              deletions
+              changedFilesIfAvailable
+              author { email name date }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+class RateLimiter:
+    
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+    
+    def update(self, headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_at = headers.get("X-RateLimit-Reset")
+        
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset_at is not None:
+            self.reset_at = float(reset_at)
+    
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining is not None and self.remaining <= 0
+    
+    async def wait(self):
+        if not self.exhausted:
+            return
+        
+        wait_seconds = max(0.0, self.reset_at - time.time())
+        logger.warning("REST rate limit exhausted, sleeping %.0fs until reset", wait_seconds)
+        await asyncio.sleep(wait_seconds)
+        self.remaining = None
+
+class CommitStatistics:
+    
+    def __init__(self):
+        self.total_commits = 0
+        self.authors = set()
+        self.start: Optional[datetime] = None
+        self.end: Optional[datetime] = None
+        self.files_changed = 0
+        self.lines_added = 0
+        self.lines_deleted = 0
+    
+    def update(self, batch: List[Dict]):
+        for commit in batch:
+            self.authors.add(commit['author'])
+            self.files_changed += commit['files_changed']
+            self.lines_added += commit['lines_added']
+            self.lines_deleted += commit['lines_deleted']
+            
+            timestamp = commit['timestamp']
+            if timestamp is not None:
+                if self.start is None or timestamp < self.start:
+                    self.start = timestamp
+                if self.end is None or timestamp > self.end:
+                    self.end = timestamp
+        
+        self.total_commits += len(batch)
+    
+    def track(self, batches: Iterable[List[Dict]]) -> Iterator[List[Dict]]:
+        for batch in batches:
+            self.update(batch)
+            yield batch
+    
+    def _mean(self, total: int) -> float:
+        return total / self.total_commits if self.total_commits else float('nan')
+    
+    def to_dict(self) -> Dict:
+        return {
+            'total_commits': self.total_commits,
+            'unique_authors': len(self.authors),
+            'date_range': {
+                'start': self.start,
+                'end': self.end
+            },
+            'avg_files_changed': self._mean(self.files_changed),
+            'avg_lines_added': self._mean(self.lines_added),
+            'avg_lines_deleted': self._mean(self.lines_deleted),
+            'total_lines_added': self.lines_added,
+            'total_lines_deleted': self.lines_deleted
+        }
+
 class GitExtractor:
     
-    def __init__(self, github_token: Optional[str] = None):
+    def __init__(
+        self,
+        github_token: Optional[str] = None,
+        cache_path: Optional[str] = DEFAULT_ETAG_CACHE_PATH
+    ):
         self.token = github_token or os.getenv("GITHUB_TOKEN")
+        self.rate_limiter = RateLimiter()
+        self.etag_cache = ETagCache(cache_path) if cache_path else None
         
-        if not self.token or self.token == "ghp_PLACEHOLDER":
+        self.session = requests.Session()
+        self.session.headers.update(self._headers())
+        adapter = HTTPAdapter(pool_connections=MAX_CONCURRENT_REQUESTS, pool_maxsize=MAX_CONCURRENT_REQUESTS)
+        self.session.mount("https://", adapter)
+        
+        if not self.has_valid_token:
             logger.warning("No valid GitHub token provided. Rate limits will be restricted.")
-            self.github = Github()
         else:
-            auth = Auth.Token(self.token)
-            self.github = Github(auth=auth)
             logger.info("GitHub API authenticated successfully")
         
         try:
-            rate_limit = self.github.get_rate_limit()
-            core_limit = rate_limit.core
-            logger.info(f"GitHub API rate limit: {core_limit.remaining}/{core_limit.limit}")
+            response = self.session.get(f"{GITHUB_API_URL}/rate_limit")
+            response.raise_for_status()
+            core_limit = orjson.loads(response.content)["resources"]["core"]
+            logger.info("GitHub API rate limit: %d/%d", core_limit['remaining'], core_limit['limit'])
         except Exception as e:
-            logger.warning(f"Could not check rate limit: {e}")
+            logger.warning("Could not check rate limit: %s", e)
+    
+    @property
+    def has_valid_token(self) -> bool:
+        return bool(self.token) and self.token != "ghp_PLACEHOLDER"
+    
+    def _headers(self) -> Dict[str, str]:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "Accept-Encoding": "gzip"
+        }
+        if self.has_valid_token:
+            headers["Authorization"] = f"bearer {self.token}"
+        return headers
     
     def extract_commits(
         self,
@@ -39,73 +246,377 @@ class GitExtractor:
         max_commits: int = 1000,
         branch: str = "main"
     ) -> pd.DataFrame:
-        logger.info(f"Starting data extraction from {repo_owner}/{repo_name}")
-        logger.info(f"Branch: {branch}, Max commits: {max_commits}")
+        logger.info("Starting data extraction from %s/%s", repo_owner, repo_name)
+        logger.info("Branch: %s, Max commits: %d", branch, max_commits)
         
         try:
-            repo = self.github.get_repo(f"{repo_owner}/{repo_name}")
-            logger.info(f"Repository found: {repo.full_name}")
+            commits_data = [
+                commit
+                for batch in self.iter_commit_batches(repo_owner, repo_name, max_commits, branch)
+                for commit in batch
+            ]
             
-            commits_data = []
-            commits = repo.get_commits(sha=branch)
+            return commits_to_frame(commits_data)
+        
+        except (aiohttp.ClientError, requests.RequestException) as e:
+            logger.error("GitHub API error: %s", e)
+            raise
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            raise
+    
+    def iter_commit_batches(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        max_commits: int = 1000,
+        branch: str = "main",
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Iterator[List[Dict]]:
+        if self.has_valid_token:
+            pages = self._graphql_commit_pages(repo_owner, repo_name, max_commits, branch)
+        else:
+            pages = self._rest_commit_pages(repo_owner, repo_name, max_commits, branch, batch_size)
+        
+        extracted_at = datetime.now()
+        batch = []
+        total = 0
+        
+        for page in pages:
+            for commit in page:
+                commit['extracted_at'] = extracted_at
+            batch.extend(page)
             
-            logger.info("Fetching commits...")
+            if len(batch) >= batch_size:
+                total += len(batch)
+                yield batch
+                batch = []
+        
+        if batch:
+            total += len(batch)
+            yield batch
+        
+        logger.info("Successfully extracted %d commits", total)
+    
+    def _rest_commit_pages(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        max_commits: int,
+        branch: str,
+        batch_size: int
+    ) -> Iterator[List[Dict]]:
+        logger.info("Fetching commits via REST...")
+        shas = asyncio.run(self._list_commits_async(repo_owner, repo_name, max_commits, branch))
+        logger.info("Found %d commits, fetching details...", len(shas))
+        
+        for start in range(0, len(shas), batch_size):
+            yield self._fetch_commits(repo_owner, repo_name, shas[start:start + batch_size])
+            logger.info("Processed %d commits...", min(start + batch_size, len(shas)))
+    
+    def _fetch_commits(self, repo_owner: str, repo_name: str, shas: List[str]) -> List[Dict]:
+        return asyncio.run(self._fetch_commits_async(repo_owner, repo_name, shas))
+    
+    def _client_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit_per_host=MAX_CONCURRENT_REQUESTS)
+        return aiohttp.ClientSession(connector=connector, headers=self._headers())
+    
+    async def _list_commits_async(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        max_commits: int,
+        branch: str
+    ) -> List[str]:
+        async with self._client_session() as session:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+            return await self._list_commit_shas(session, semaphore, repo_owner, repo_name, max_commits, branch)
+    
+    async def _fetch_commits_async(self, repo_owner: str, repo_name: str, shas: List[str]) -> List[Dict]:
+        async with self._client_session() as session:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+            return await self._gather_commits(session, semaphore, repo_owner, repo_name, shas)
+    
+    async def _list_commit_shas(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        repo_owner: str,
+        repo_name: str,
+        max_commits: int,
+        branch: str
+    ) -> List[str]:
+        url = f"{GITHUB_API_URL}/repos/{repo_owner}/{repo_name}/commits"
+        num_pages = -(-max_commits // REST_PAGE_SIZE)
+        
+        pages = await asyncio.gather(*(
+            self._get_json(session, semaphore, url, params={"sha": branch, "per_page": REST_PAGE_SIZE, "page": page})
+            for page in range(1, num_pages + 1)
+        ))
+        
+        return [commit["sha"] for page in pages for commit in page][:max_commits]
+    
+    async def _gather_commits(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        repo_owner: str,
+        repo_name: str,
+        shas: List[str]
+    ) -> List[Dict]:
+        results = await asyncio.gather(
+            *(self._fetch_commit(session, semaphore, repo_owner, repo_name, sha) for sha in shas),
+            return_exceptions=True
+        )
+        
+        commits_data = []
+        for sha, result in zip(shas, results):
+            if isinstance(result, Exception):
+                logger.error("Error processing commit %s: %s", sha, result)
+                continue
+            commits_data.append(result)
+        
+        if self.etag_cache is not None:
+            self.etag_cache.commit()
+        
+        return commits_data
+    
+    async def _fetch_commit(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        repo_owner: str,
+        repo_name: str,
+        sha: str
+    ) -> Dict:
+        url = f"{GITHUB_API_URL}/repos/{repo_owner}/{repo_name}/commits/{sha}"
+        cached = self.etag_cache.get(sha) if self.etag_cache is not None else None
+        
+        body, etag = await self._get(
+            session, semaphore, url, etag=cached[0] if cached else None
+        )
+        
+        if body is None:
+            body = cached[1]
+        elif self.etag_cache is not None and etag:
+            self.etag_cache.put(sha, etag, body)
+        
+        return self._extract_commit_data(orjson.loads(body))
+    
+    async def _get_json(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        url: str,
+        params: Optional[Dict] = None
+    ):
+        body, _ = await self._get(session, semaphore, url, params=params)
+        return orjson.loads(body)
+    
+    async def _get(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        url: str,
+        params: Optional[Dict] = None,
+        etag: Optional[str] = None
+    ) -> Tuple[Optional[bytes], Optional[str]]:
+        headers = {"If-None-Match": etag} if etag else None
+        
+        for attempt in range(MAX_RETRIES):
+            await self.rate_limiter.wait()
             
-            for idx, commit in enumerate(commits[:max_commits]):
-                if idx % 100 == 0:
-                    logger.info(f"Processed {idx} commits...")
-                
-                try:
-                    commit_dict = self._extract_commit_data(commit)
-                    commits_data.append(commit_dict)
+            async with semaphore:
+                async with session.get(url, params=params, headers=headers) as response:
+                    self.rate_limiter.update(response.headers)
+                    
+                    if response.status == 304:
+                        return None, etag
+                    
+                    if response.status not in RETRY_STATUSES and response.status < 500:
+                        response.raise_for_status()
+                        return await response.read(), response.headers.get("ETag")
                     
-                except Exception as e:
-                    logger.error(f"Error processing commit {commit.sha}: {e}")
-                    continue
+                    status = response.status
+                    retry_after = response.headers.get("Retry-After")
+            
+            if status == 403 and self.rate_limiter.exhausted:
+                continue
+            
+            if retry_after is not None and retry_after.isdigit():
+                backoff = float(retry_after)
+            else:
+                backoff = 2 ** attempt + random.random()
+            logger.warning("GET %s returned %d, retrying in %.1fs", url, status, backoff)
+            await asyncio.sleep(backoff)
+        
+        raise RuntimeError(f"GET {url} failed after {MAX_RETRIES} attempts")
+    
+    def _graphql_commit_pages(
+        self,
+        repo_owner: str,
+        repo_name: str,
+        max_commits: int,
+        branch: str
+    ) -> Iterator[List[Dict]]:
+        fetched = 0
+        cursor = None
+        
+        logger.info("Fetching commits via GraphQL...")
+        
+        while fetched < max_commits:
+            remaining = max_commits - fetched
+            variables = {
+                "owner": repo_owner,
+                "name": repo_name,
+                "ref": branch,
+                "first": min(GRAPHQL_PAGE_SIZE, remaining),
+                "cursor": cursor
+            }
+            
+            response = self.session.post(
+                GITHUB_GRAPHQL_URL,
+                json={"query": COMMIT_HISTORY_QUERY, "variables": variables}
+            )
+            response.raise_for_status()
+            payload = orjson.loads(response.content)
+            
+            if payload.get("errors"):
+                raise RuntimeError(f"GraphQL query failed: {payload['errors']}")
+            
+            data = payload["data"]
+            ref = data["repository"]["ref"] if data["repository"] else None
+            if ref is None:
+                raise ValueError(f"Branch '{branch}' not found in {repo_owner}/{repo_name}")
+            
+            history = ref["target"]["history"]
+            page = []
+            rest_fallback = []
+            for node in history["nodes"]:
+                if node["changedFilesIfAvailable"] is None:
+                    rest_fallback.append(node["oid"])
+                else:
+                    page.append(self._graphql_node_to_dict(node))
             
-            logger.info(f"Successfully extracted {len(commits_data)} commits")
+            if rest_fallback:
+                logger.info("Falling back to REST for %d commits without file counts", len(rest_fallback))
+                page.extend(self._fetch_commits(repo_owner, repo_name, rest_fallback))
             
-            df = pd.DataFrame(commits_data)
+            fetched += len(history["nodes"])
+            logger.info("Processed %d commits...", fetched)
+            yield page
             
-            df['extracted_at'] = datetime.now()
+            page_info = history["pageInfo"]
+            if not page_info["hasNextPage"]:
+                break
+            cursor = page_info["endCursor"]
             
-            return df
+            self._respect_graphql_rate_limit(data["rateLimit"])
+    
+    def _graphql_node_to_dict(self, node: Dict) -> Dict:
+        author = node["author"] or {}
+        additions = node["additions"]
+        deletions = node["deletions"]
         
-        except GithubException as e:
-            logger.error(f"GitHub API error: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            raise
+        return {
+            'commit_hash': node["oid"],
+            'author': author.get("email") or 'unknown',
+            'author_name': author.get("name") or 'unknown',
+            'timestamp': parse_github_timestamp(author.get("date")),
+            'message': node["message"],
+            'files_changed': node["changedFilesIfAvailable"],
+            'lines_added': additions,
+            'lines_deleted': deletions,
+            'total_changes': additions + deletions
+        }
     
-    def _extract_commit_data(self, commit) -> Dict:
-        stats = commit.stats
+    def _respect_graphql_rate_limit(self, rate_limit: Optional[Dict]):
+        if not rate_limit or rate_limit["remaining"] > 0:
+            return
         
-        try:
-            files_changed = commit.files.totalCount
-        except:
-            files_changed = len(list(commit.files))
+        reset_at = datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00"))
+        wait_seconds = max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+        logger.warning("GraphQL rate limit exhausted, sleeping %.0fs until reset", wait_seconds)
+        time.sleep(wait_seconds)
+    
+    def _extract_commit_data(self, payload: Dict) -> Dict:
+        commit = payload['commit']
+        author = commit.get('author') or {}
+        stats = payload.get('stats') or {}
         
         commit_data = {
-            'commit_hash': commit.sha,
-            'author': commit.commit.author.email if commit.commit.author else 'unknown',
-            'author_name': commit.commit.author.name if commit.commit.author else 'unknown',
-            'timestamp': commit.commit.author.date,
-            'message': commit.commit.message,
-            'files_changed': files_changed,
-            'lines_added': stats.additions,
-            'lines_deleted': stats.deletions,
-            'total_changes': stats.total
+            'commit_hash': payload['sha'],
+            'author': author.get('email') or 'unknown',
+            'author_name': author.get('name') or 'unknown',
+            'timestamp': parse_github_timestamp(author.get('date')),
+            'message': commit.get('message', ''),
+            'files_changed': len(payload.get('files') or []),
+            'lines_added': stats.get('additions', 0),
+            'lines_deleted': stats.get('deletions', 0),
+            'total_changes': stats.get('total', 0)
         }
         
         return commit_data
     
-    def save_to_csv(self, df: pd.DataFrame, output_path: str):
+    def save_to_csv(self, data: Union[pd.DataFrame, Iterable[List[Dict]]], output_path: str) -> int:
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        df.to_csv(output_path, index=False)
+        if isinstance(data, pd.DataFrame):
+            data.to_csv(output_path, index=False)
+            total = len(data)
+        else:
+            total = self._write_batches_to_csv(data, output_path)
+        
+        logger.info(f"Data saved to {output_path}")
+        logger.info(f"Total records: {total}")
+        return total
+    
+    def _write_batches_to_csv(self, batches: Iterable[List[Dict]], output_path: str) -> int:
+        total = 0
+        
+        with open(output_path, 'wb', buffering=CSV_WRITE_BUFFER_SIZE) as f:
+            f.write(CSV_HEADER.encode())
+            
+            for batch in batches:
+                f.write("".join(map(format_commit_row, batch)).encode())
+                total += len(batch)
+        
+        return total
+    
+    def save_to_parquet(self, data: Union[pd.DataFrame, Iterable[List[Dict]]], output_path: str) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        schema = commit_arrow_schema()
+        
+        if isinstance(data, pd.DataFrame):
+            table = pa.Table.from_pandas(data, schema=schema, preserve_index=False)
+            pq.write_table(table, output_path, compression='zstd')
+            total = len(data)
+        else:
+            total = 0
+            with pq.ParquetWriter(output_path, schema, compression='zstd') as writer:
+                for batch in data:
+                    if not batch:
+                        continue
+                    
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    total += len(batch)
+        
         logger.info(f"Data saved to {output_path}")
-        logger.info(f"Total records: {len(df)}")
+        logger.info(f"Total records: {total}")
+        return total
+    
+    def save(self, data: Union[pd.DataFrame, Iterable[List[Dict]]], output_path: str) -> int:
+        if output_path.endswith(".parquet"):
+            return self.save_to_parquet(data, output_path)
+        return self.save_to_csv(data, output_path)
+    
+    def close(self):
+        if self.etag_cache is not None:
+            self.etag_cache.close()
+        self.session.close()
     
     def get_statistics(self, df: pd.DataFrame) -> Dict:
         stats = {
@@ -158,4 +669,7 @@ if __name__ == "__main__":
         print(f"   Avg lines deleted: {stats['avg_lines_deleted']:.2f}")
         
     except Exception as e:
-        logger.error(f"❌ Test failed: {e}")
\ No newline at end of file
+        logger.error(f"❌ Test failed: {e}")
+    
+    finally:
+        extractor.close()
\ No newline at end of file
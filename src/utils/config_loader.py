@@ -1,14 +1,29 @@
 
 import os
+import re
+import copy
 import yaml
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Mapping, Optional
 from dotenv import load_dotenv
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+ENV_VAR_PATTERN = re.compile(r'\$\{([^:]*)(?::(.*))?\}', re.DOTALL)
+
+@lru_cache(maxsize=None)
+def _load_yaml_cached(path_str: str) -> Dict[str, Any]:
+    with open(path_str, 'r') as f:
+        config = yaml.load(f, Loader=YamlLoader)
+    
+    logger.info(f"Loaded configuration from {path_str}")
+    return config
+
 class ConfigLoader:
     
     def __init__(self, config_dir: str = "config"):
@@ -19,42 +34,39 @@ class ConfigLoader:
         logger.info("ConfigLoader initialized")
     
     def load_yaml(self, filename: str) -> Dict[str, Any]:
+        return copy.deepcopy(self._load_yaml_shared(filename))
+    
+    def _load_yaml_shared(self, filename: str) -> Dict[str, Any]:
         filepath = self.config_dir / filename
         
         if not filepath.exists():
             raise FileNotFoundError(f"Configuration file not found: {filepath}")
         
-        with open(filepath, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        logger.info(f"Loaded configuration from {filename}")
-        return config
+        return _load_yaml_cached(str(filepath.resolve()))
     
     def load_main_config(self) -> Dict[str, Any]:
         return self.load_yaml("config.yaml")
     
     def load_db_config(self) -> Dict[str, Any]:
-        config = self.load_yaml("db_config.yaml")
-        
-        config = self._resolve_env_vars(config)
+        config = self._resolve_env_vars(self._load_yaml_shared("db_config.yaml"))
         
         return config
     
-    def _resolve_env_vars(self, config: Dict[str, Any]) -> Dict[str, Any]:
+    def _resolve_env_vars(self, config: Dict[str, Any], environ: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+        if environ is None:
+            environ = os.environ
+        
         if isinstance(config, dict):
-            return {k: self._resolve_env_vars(v) for k, v in config.items()}
+            return {k: self._resolve_env_vars(v, environ) for k, v in config.items()}
         elif isinstance(config, list):
-            return [self._resolve_env_vars(item) for item in config]
-        elif isinstance(config, str) and config.startswith("${") and config.endswith("}"):
-            var_spec = config[2:-1]
-            
-            if ":" in var_spec:
-                var_name, default = var_spec.split(":", 1)
-            else:
-                var_name = var_spec
-                default = None
+            return [self._resolve_env_vars(item, environ) for item in config]
+        elif isinstance(config, str):
+            match = ENV_VAR_PATTERN.fullmatch(config)
+            if match is None:
+                return config
             
-            value = os.getenv(var_name, default)
+            var_name, default = match.group(1, 2)
+            value = environ.get(var_name, default)
             
             if value is None:
                 raise ValueError(f"Environment variable {var_name} not set and no default provided")
@@ -77,7 +89,7 @@ class ConfigLoader:
         return url
     
     def get(self, key: str, config_file: str = "config.yaml", default: Any = None) -> Any:
-        config = self.load_yaml(config_file)
+        config = self._load_yaml_shared(config_file)
         
         keys = key.split(".")
         value = config
@@ -88,7 +100,7 @@ class ConfigLoader:
             else:
                 return default
         
-        return value
+        return copy.deepcopy(value)
     
     def get_llm_config(self) -> Dict[str, Any]:
         use_gemini = os.getenv("USE_GEMINI", "false").lower() == "true"
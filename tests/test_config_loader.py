@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from src.utils.config_loader import ConfigLoader
+
+
+@pytest.fixture
+def loader():
+    return ConfigLoader.__new__(ConfigLoader)
+
+
+class TestResolveEnvVars:
+    def test_variable_set(self, loader):
+        assert loader._resolve_env_vars("${DB_HOST}", {"DB_HOST": "db"}) == "db"
+
+    def test_default_used(self, loader):
+        assert loader._resolve_env_vars("${DB_PORT:5432}", {}) == "5432"
+
+    def test_default_splits_on_first_colon(self, loader):
+        config = "${DB_URL:postgresql://localhost:5432/db}"
+        assert loader._resolve_env_vars(config, {}) == "postgresql://localhost:5432/db"
+
+    def test_empty_default(self, loader):
+        assert loader._resolve_env_vars("${DB_PASSWORD:}", {}) == ""
+
+    def test_missing_without_default(self, loader):
+        with pytest.raises(ValueError):
+            loader._resolve_env_vars("${DB_HOST}", {})
+
+    def test_empty_name(self, loader):
+        with pytest.raises(ValueError):
+            loader._resolve_env_vars("${}", {})
+
+    def test_trailing_newline_not_resolved(self, loader):
+        assert loader._resolve_env_vars("${A}\n", {"A": "x"}) == "${A}\n"
+
+    def test_brace_in_name(self, loader):
+        assert loader._resolve_env_vars("${A}B}", {"A}B": "x"}) == "x"
+
+    def test_plain_values_untouched(self, loader):
+        config = {"host": "localhost", "port": 5432, "hosts": ["a", "${B}"]}
+        assert loader._resolve_env_vars(config, {"B": "b"}) == {
+            "host": "localhost", "port": 5432, "hosts": ["a", "b"]
+        }
@@ -0,0 +1,268 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import csv
+import io
+
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from src.ingestion.db_loader import CsvRowStream, DatabaseLoader, downcast_numeric
+
+
+ROWS = [
+    ["a" * 40, "dev@example.com", 'Fix "quoted", comma', 10],
+    ["b" * 40, None, "multi\nline\r\nmessage", 0],
+    ["c" * 40, "other@example.com", "", 123456],
+]
+
+
+EXPECTED_CSV = (
+    '"' + "a" * 40 + '","dev@example.com","Fix ""quoted"", comma",10\n'
+    '"' + "b" * 40 + '",,"multi\nline\r\nmessage",0\n'
+    '"' + "c" * 40 + '","other@example.com","",123456\n'
+)
+
+
+def read_all(stream, size):
+    chunks = []
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return chunks
+        chunks.append(chunk)
+
+
+class TestCsvRowStream:
+    def test_read_everything(self):
+        assert CsvRowStream(iter(ROWS)).read() == EXPECTED_CSV
+
+    @pytest.mark.parametrize("size", [1, 2, 7, 50, 4096])
+    def test_small_reads_split_buffer(self, size):
+        chunks = read_all(CsvRowStream(iter(ROWS)), size)
+
+        assert "".join(chunks) == EXPECTED_CSV
+        assert all(len(chunk) <= size for chunk in chunks)
+        assert all(len(chunk) == size for chunk in chunks[:-1])
+
+    def test_sized_read_then_read_rest(self):
+        stream = CsvRowStream(iter(ROWS))
+        head = stream.read(5)
+        assert head + stream.read() == EXPECTED_CSV
+        assert stream.read() == ""
+
+    def test_none_written_as_empty_field(self):
+        data = CsvRowStream(iter([["x", None, 1]])).read()
+        assert data == '"x",,1\n'
+
+    def test_empty_string_distinct_from_none(self):
+        assert CsvRowStream(iter([["", None]])).read() == '"",\n'
+
+    def test_quoting_round_trips(self):
+        data = "".join(read_all(CsvRowStream(iter(ROWS)), 3))
+        parsed = list(csv.reader(io.StringIO(data, newline="")))
+        assert parsed == [["" if v is None else str(v) for v in row] for row in ROWS]
+
+    def test_empty_rows(self):
+        assert CsvRowStream(iter([])).read(10) == ""
+
+    def test_dataframe_rows_nan_becomes_empty(self):
+        df = pd.DataFrame({"commit_hash": ["a", "b"], "author": ["dev", None]})
+        data = CsvRowStream(DatabaseLoader._iter_rows(df)).read()
+        assert data == '"a","dev"\n"b",\n'
+
+
+def commit_frame(hashes):
+    return pd.DataFrame({
+        "commit_hash": hashes,
+        "author": "dev@example.com",
+        "author_name": "Dev",
+        "timestamp": pd.Timestamp("2024-03-01"),
+        "message": "",
+        "files_changed": 1,
+        "lines_added": 2,
+        "lines_deleted": 3,
+        "total_changes": 5,
+    })
+
+
+@pytest.fixture
+def sqlite_loader(tmp_path):
+    loader = DatabaseLoader(f"sqlite:///{tmp_path / 'commits.db'}")
+    loader.connect()
+    loader.create_table_if_not_exists()
+    loader._optimal_batch = 2
+    yield loader
+    loader.close()
+
+
+class TestLoadInBatches:
+    def test_all_batches_loaded(self, sqlite_loader):
+        assert sqlite_loader.load_dataframe(commit_frame(["a", "b", "c", "d"])) == 4
+        assert sqlite_loader.get_record_count() == 4
+
+    def test_failed_batch_rolls_back_earlier_batches(self, sqlite_loader):
+        with pytest.raises(Exception):
+            sqlite_loader.load_dataframe(commit_frame(["a", "b", "c", "a"]))
+
+        assert sqlite_loader.get_record_count() == 0
+
+    def test_shared_connection_not_committed_per_batch(self, sqlite_loader):
+        with pytest.raises(Exception):
+            with sqlite_loader.session() as conn:
+                sqlite_loader.load_dataframe(commit_frame(["a", "b", "c", "d"]), conn=conn)
+                raise RuntimeError("abort")
+
+        assert sqlite_loader.get_record_count() == 0
+
+
+class TestDowncastNumeric:
+    def test_counts_downcast_to_int32(self):
+        df = downcast_numeric(commit_frame(["a", "b"]))
+        assert str(df["lines_added"].dtype) == "int32"
+        assert df["commit_hash"].tolist() == ["a", "b"]
+
+    def test_out_of_range_raises(self):
+        df = commit_frame(["a", "b"])
+        df["lines_added"] = [1, 2 ** 31 + 5]
+
+        with pytest.raises(ValueError, match="lines_added"):
+            downcast_numeric(df)
+
+    def test_negative_out_of_range_raises(self):
+        df = commit_frame(["a"])
+        df["total_changes"] = [-(2 ** 31) - 1]
+
+        with pytest.raises(ValueError, match="total_changes"):
+            downcast_numeric(df)
+
+    def test_int32_bounds_accepted(self):
+        df = commit_frame(["a", "b"])
+        df["lines_added"] = [-(2 ** 31), 2 ** 31 - 1]
+        assert downcast_numeric(df)["lines_added"].tolist() == [-(2 ** 31), 2 ** 31 - 1]
+
+    def test_empty_frame(self):
+        assert downcast_numeric(commit_frame([])).empty
+
+
+class FakeCursor:
+    def __init__(self, log, rowcount=0):
+        self.log = log
+        self.rowcount = rowcount
+        self.copied = None
+
+    def execute(self, sql):
+        self.log.append(sql)
+
+    def copy_expert(self, sql, file):
+        self.log.append(sql)
+        self.copied = file.read()
+
+    def close(self):
+        pass
+
+
+def postgres_connection(log, rowcount=0, constraint=None):
+    cursor = FakeCursor(log, rowcount)
+    conn = MagicMock()
+    conn.connection.cursor.return_value = cursor
+
+    def execute(statement, params=None):
+        log.append(str(statement).strip())
+        result = MagicMock()
+        result.first.return_value = constraint
+        return result
+
+    conn.execute.side_effect = execute
+    return conn, cursor
+
+
+@pytest.fixture
+def postgres_loader():
+    loader = DatabaseLoader("postgresql+psycopg2://user@localhost/db")
+    loader.engine = MagicMock()
+    loader.engine.dialect.name = "postgresql"
+    return loader
+
+
+class TestCopyToPostgres:
+    def test_staging_table_and_on_conflict(self, postgres_loader):
+        log = []
+        conn, cursor = postgres_connection(log, rowcount=1)
+        df = pd.DataFrame({"commit_hash": ["a", "b"], "message": ["", None]})
+
+        rows_loaded = postgres_loader._copy_to_postgres(df, "raw_commits", "commit_hash", conn)
+
+        assert log == [
+            "CREATE TEMP TABLE raw_commits_staging ON COMMIT DROP AS "
+            "SELECT commit_hash, message FROM raw_commits WITH NO DATA",
+            "COPY raw_commits_staging (commit_hash, message) FROM STDIN WITH CSV",
+            "INSERT INTO raw_commits (commit_hash, message) "
+            "SELECT commit_hash, message FROM raw_commits_staging "
+            "ON CONFLICT (commit_hash) DO NOTHING",
+            "DROP TABLE raw_commits_staging",
+        ]
+        assert cursor.copied == '"a",""\n"b",\n'
+        assert rows_loaded == 1
+
+    def test_without_conflict_column_copies_directly(self, postgres_loader):
+        log = []
+        conn, _ = postgres_connection(log)
+        df = pd.DataFrame({"commit_hash": ["a", "b"]})
+
+        assert postgres_loader._copy_to_postgres(df, "raw_commits", None, conn) == 2
+        assert log == ["COPY raw_commits (commit_hash) FROM STDIN WITH CSV"]
+
+    def test_load_dataframe_uses_copy_path(self, postgres_loader):
+        log = []
+        conn, _ = postgres_connection(log, rowcount=3)
+        df = commit_frame(["a", "b", "c", "d"])
+
+        assert postgres_loader.load_dataframe(df, conn=conn) == 3
+        assert [sql.split()[0] for sql in log] == ["CREATE", "COPY", "INSERT", "DROP"]
+        assert "ON CONFLICT (commit_hash) DO NOTHING" in log[2]
+
+
+class TestBulkLoad:
+    def test_primary_key_dropped_and_restored(self, postgres_loader):
+        log = []
+        conn, _ = postgres_connection(log, constraint=("raw_commits_pkey", "p"))
+
+        assert postgres_loader.bulk_load(commit_frame(["a", "b"]), conn=conn) == 2
+
+        assert "pg_constraint" in log[0]
+        assert log[1:3] == [
+            'ALTER TABLE raw_commits DROP CONSTRAINT "raw_commits_pkey"',
+            "COPY raw_commits (commit_hash, author, author_name, timestamp, message, files_changed, "
+            "lines_added, lines_deleted, total_changes) FROM STDIN WITH CSV",
+        ]
+        assert log[3:] == [
+            'ALTER TABLE raw_commits ADD CONSTRAINT "raw_commits_pkey" PRIMARY KEY (commit_hash)'
+        ]
+
+    def test_unique_constraint_restored_as_unique(self, postgres_loader):
+        log = []
+        conn, _ = postgres_connection(log, constraint=("raw_commits_commit_hash_key", "u"))
+
+        postgres_loader.bulk_load(commit_frame(["a"]), conn=conn)
+
+        assert log[1] == 'ALTER TABLE raw_commits DROP CONSTRAINT "raw_commits_commit_hash_key"'
+        assert log[-1] == (
+            'ALTER TABLE raw_commits ADD CONSTRAINT "raw_commits_commit_hash_key" UNIQUE (commit_hash)'
+        )
+
+    def test_refuses_without_commit_hash_constraint(self, postgres_loader):
+        log = []
+        conn, _ = postgres_connection(log, constraint=None)
+
+        with pytest.raises(RuntimeError, match="refusing to bulk load"):
+            postgres_loader.bulk_load(commit_frame(["a"]), conn=conn)
+
+        assert len(log) == 1
+        assert "pg_constraint" in log[0]
+
+    def test_requires_postgres(self, postgres_loader):
+        postgres_loader.engine.dialect.name = "sqlite"
+        with pytest.raises(RuntimeError, match="PostgreSQL"):
+            postgres_loader.bulk_load(commit_frame(["a"]))
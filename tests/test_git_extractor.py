@@ -0,0 +1,357 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import io
+import asyncio
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from datetime import timezone
+
+import orjson
+import pandas as pd
+import pytest
+from src.ingestion.etag_cache import ETagCache
+from src.ingestion.git_extractor import (
+    GitExtractor,
+    CommitStatistics,
+    RateLimiter,
+    COMMIT_COLUMNS,
+    CSV_HEADER,
+    MAX_RETRIES,
+    commit_arrow_schema,
+    commits_to_frame,
+    format_commit_row,
+    parse_github_timestamp,
+)
+
+
+@pytest.fixture
+def extractor():
+    return GitExtractor.__new__(GitExtractor)
+
+
+def graphql_node(date="2024-03-01T23:30:00-05:00"):
+    return {
+        "oid": "a" * 40,
+        "message": "Fix parser",
+        "additions": 10,
+        "deletions": 4,
+        "changedFilesIfAvailable": 2,
+        "author": {"email": "dev@example.com", "name": "Dev", "date": date},
+    }
+
+
+def rest_payload(date="2024-03-01T23:30:00-05:00"):
+    return {
+        "sha": "a" * 40,
+        "commit": {
+            "message": "Fix parser",
+            "author": {"email": "dev@example.com", "name": "Dev", "date": date},
+        },
+        "stats": {"additions": 10, "deletions": 4, "total": 14},
+        "files": [{"filename": "a.py"}, {"filename": "b.py"}],
+    }
+
+
+class TestTimestamps:
+    def test_offset_normalised_to_utc(self):
+        ts = parse_github_timestamp("2024-03-01T23:30:00-05:00")
+        assert ts.tzinfo == timezone.utc
+        assert (ts.day, ts.hour) == (2, 4)
+
+    def test_zulu_suffix(self):
+        assert parse_github_timestamp("2024-03-01T10:00:00Z").hour == 10
+
+    def test_missing_date(self):
+        assert parse_github_timestamp(None) is None
+
+    def test_graphql_and_rest_paths_agree(self, extractor):
+        from_graphql = extractor._graphql_node_to_dict(graphql_node())
+        from_rest = extractor._extract_commit_data(rest_payload())
+        assert from_graphql == from_rest
+        assert from_graphql["timestamp"].utcoffset().total_seconds() == 0
+
+
+def commit_record(i, author="dev@example.com"):
+    return {
+        "commit_hash": f"{i:040x}",
+        "author": author,
+        "author_name": "Dev",
+        "timestamp": parse_github_timestamp(f"2024-03-{i + 1:02d}T10:00:00Z"),
+        "message": f"commit {i}",
+        "files_changed": i + 1,
+        "lines_added": 10 * i,
+        "lines_deleted": i,
+        "total_changes": 11 * i,
+        "extracted_at": None,
+    }
+
+
+class TestCommitStatistics:
+    def test_matches_dataframe_statistics(self, extractor):
+        batches = [
+            [commit_record(0), commit_record(1, "other@example.com")],
+            [commit_record(2)],
+        ]
+        statistics = CommitStatistics()
+        assert list(statistics.track(batches)) == batches
+
+        records = [commit for batch in batches for commit in batch]
+        df = commits_to_frame(records)
+        expected = extractor.get_statistics(df)
+        stats = statistics.to_dict()
+
+        assert stats["total_commits"] == expected["total_commits"] == 3
+        assert stats["unique_authors"] == expected["unique_authors"] == 2
+        assert stats["date_range"]["start"] == expected["date_range"]["start"]
+        assert stats["date_range"]["end"] == expected["date_range"]["end"]
+        assert stats["avg_files_changed"] == pytest.approx(expected["avg_files_changed"])
+        assert stats["avg_lines_added"] == pytest.approx(expected["avg_lines_added"])
+        assert stats["total_lines_deleted"] == expected["total_lines_deleted"]
+
+    def test_empty(self):
+        stats = CommitStatistics().to_dict()
+        assert stats["total_commits"] == 0
+        assert stats["date_range"]["start"] is None
+
+
+class TestSaveToParquet:
+    def test_stream_and_dataframe_share_schema(self, extractor, tmp_path):
+        records = [commit_record(i) for i in range(3)]
+        df = commits_to_frame(records)
+
+        streamed = tmp_path / "streamed.parquet"
+        framed = tmp_path / "framed.parquet"
+        extractor.save_to_parquet(iter([records[:2], records[2:]]), str(streamed))
+        extractor.save_to_parquet(df, str(framed))
+
+        import pyarrow.parquet as pq
+        schema = commit_arrow_schema()
+        assert pq.read_schema(streamed).remove_metadata() == schema
+        assert pq.read_schema(framed).remove_metadata() == schema
+        assert str(pd.read_parquet(streamed)["lines_added"].dtype) == "int32"
+
+    def test_all_none_column_in_first_batch(self, extractor, tmp_path):
+        first = [commit_record(0)]
+        first[0]["timestamp"] = None
+        later = [commit_record(1)]
+        later[0]["extracted_at"] = parse_github_timestamp("2024-03-05T00:00:00Z").replace(tzinfo=None)
+
+        path = tmp_path / "commits.parquet"
+        assert extractor.save_to_parquet(iter([first, later]), str(path)) == 2
+
+        result = pd.read_parquet(path)
+        assert result["timestamp"].isna().tolist() == [True, False]
+
+    def test_empty_stream_writes_schema(self, extractor, tmp_path):
+        path = tmp_path / "empty.parquet"
+        assert extractor.save_to_parquet(iter([]), str(path)) == 0
+        assert list(pd.read_parquet(path).columns) == list(COMMIT_COLUMNS)
+
+
+class TestFormatCommitRow:
+    def read_rows(self, records):
+        text = CSV_HEADER + "".join(format_commit_row(record) for record in records)
+        return pd.read_csv(io.StringIO(text), keep_default_na=False, dtype={"commit_hash": str})
+
+    def test_round_trips_special_characters(self):
+        record = commit_record(1)
+        record["author_name"] = 'O\'Brien, "Dev"'
+        record["message"] = 'Fix "quoted", comma\nsecond line\r\n\n"'
+        record["extracted_at"] = parse_github_timestamp("2024-03-05T00:00:00Z")
+
+        row = self.read_rows([record]).iloc[0]
+
+        for column in ("commit_hash", "author", "author_name", "message"):
+            assert row[column] == record[column]
+        for column in ("files_changed", "lines_added", "lines_deleted", "total_changes"):
+            assert row[column] == record[column]
+        assert pd.Timestamp(row["timestamp"]) == record["timestamp"]
+        assert pd.Timestamp(row["extracted_at"]) == record["extracted_at"]
+
+    def test_missing_values_are_empty(self):
+        record = commit_record(0)
+        record["timestamp"] = None
+        record["author"] = None
+
+        row = self.read_rows([record, commit_record(1)]).iloc[0]
+
+        assert row["timestamp"] == ""
+        assert row["author"] == ""
+        assert row["extracted_at"] == ""
+
+    def test_matches_pandas_to_csv(self):
+        records = [commit_record(i) for i in range(3)]
+        records[1]["message"] = 'multi\nline, "quoted"'
+        df = commits_to_frame(records)
+
+        ours = self.read_rows(records)
+        expected = pd.read_csv(io.StringIO(df.to_csv(index=False)), keep_default_na=False, dtype={"commit_hash": str})
+
+        pd.testing.assert_frame_equal(ours, expected)
+
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def read(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    @asynccontextmanager
+    async def get(self, url, params=None, headers=None):
+        self.requests.append(headers or {})
+        yield self.responses.pop(0)
+
+
+@pytest.fixture
+def cached_extractor(extractor, tmp_path):
+    extractor.rate_limiter = RateLimiter()
+    extractor.etag_cache = ETagCache(str(tmp_path / "etags.sqlite"))
+    yield extractor
+    extractor.etag_cache.close()
+
+
+def fetch_commit(extractor, session):
+    return asyncio.run(
+        extractor._fetch_commit(session, asyncio.Semaphore(1), "owner", "repo", "a" * 40)
+    )
+
+
+class TestETagCache:
+    def test_not_modified_reparses_cached_body(self, cached_extractor):
+        body = orjson.dumps(rest_payload())
+        session = FakeSession([
+            FakeResponse(200, body, {"ETag": '"v1"'}),
+            FakeResponse(304),
+        ])
+
+        first = fetch_commit(cached_extractor, session)
+        second = fetch_commit(cached_extractor, session)
+
+        assert second == first == cached_extractor._extract_commit_data(rest_payload())
+        assert session.requests == [{}, {"If-None-Match": '"v1"'}]
+
+    def test_cached_body_goes_through_current_parser(self, cached_extractor):
+        cached_extractor.etag_cache.put("a" * 40, '"v1"', orjson.dumps(rest_payload()))
+
+        commit = fetch_commit(cached_extractor, FakeSession([FakeResponse(304)]))
+
+        assert commit["timestamp"].tzinfo == timezone.utc
+        assert commit["timestamp"].hour == 4
+
+    def test_response_without_etag_not_cached(self, cached_extractor):
+        fetch_commit(cached_extractor, FakeSession([FakeResponse(200, orjson.dumps(rest_payload()))]))
+        assert cached_extractor.etag_cache.get("a" * 40) is None
+
+    def test_old_format_cache_discarded(self, tmp_path):
+        path = str(tmp_path / "etags.sqlite")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE etags (sha TEXT PRIMARY KEY, etag TEXT, payload BLOB)")
+        conn.execute("INSERT INTO etags VALUES ('abc', 'v0', x'80')")
+        conn.commit()
+        conn.close()
+
+        cache = ETagCache(path)
+        assert cache.get("abc") is None
+        cache.close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+
+    async def fake_sleep(seconds):
+        recorded.append(seconds)
+
+    monkeypatch.setattr("src.ingestion.git_extractor.asyncio.sleep", fake_sleep)
+    monkeypatch.setattr("src.ingestion.git_extractor.random.random", lambda: 0.0)
+    return recorded
+
+
+class TestRateLimiter:
+    def test_update_from_headers(self):
+        limiter = RateLimiter()
+        limiter.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1700000000"})
+        assert limiter.exhausted
+        assert limiter.reset_at == 1700000000.0
+
+    def test_missing_headers_leave_state(self):
+        limiter = RateLimiter()
+        limiter.update({})
+        assert limiter.remaining is None
+        assert not limiter.exhausted
+
+    def test_wait_sleeps_until_reset(self, sleeps):
+        limiter = RateLimiter()
+        limiter.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 30)})
+
+        asyncio.run(limiter.wait())
+
+        assert sleeps[0] == pytest.approx(30, abs=1)
+        assert not limiter.exhausted
+
+    def test_wait_noop_with_budget_left(self, sleeps):
+        limiter = RateLimiter()
+        limiter.update({"X-RateLimit-Remaining": "10"})
+        asyncio.run(limiter.wait())
+        assert sleeps == []
+
+
+class TestRetries:
+    @pytest.fixture
+    def rest_extractor(self, extractor):
+        extractor.rate_limiter = RateLimiter()
+        return extractor
+
+    def get(self, extractor, session):
+        return asyncio.run(extractor._get(session, asyncio.Semaphore(1), "https://api.github.com/x"))
+
+    def test_server_errors_back_off_exponentially(self, rest_extractor, sleeps):
+        session = FakeSession([FakeResponse(502), FakeResponse(503), FakeResponse(200, b"{}")])
+        assert self.get(rest_extractor, session) == (b"{}", None)
+        assert sleeps == [1, 2]
+
+    def test_secondary_rate_limit_honours_retry_after(self, rest_extractor, sleeps):
+        session = FakeSession([FakeResponse(429, headers={"Retry-After": "7"}), FakeResponse(200, b"{}")])
+        assert self.get(rest_extractor, session) == (b"{}", None)
+        assert sleeps == [7.0]
+
+    def test_429_without_retry_after_backs_off(self, rest_extractor, sleeps):
+        session = FakeSession([FakeResponse(429), FakeResponse(200, b"{}")])
+        assert self.get(rest_extractor, session) == (b"{}", None)
+        assert sleeps == [1]
+
+    def test_exhausted_primary_limit_waits_for_reset(self, rest_extractor, sleeps):
+        headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 60)}
+        session = FakeSession([FakeResponse(403, headers=headers), FakeResponse(200, b"{}")])
+
+        assert self.get(rest_extractor, session) == (b"{}", None)
+        assert len(sleeps) == 1
+        assert sleeps[0] == pytest.approx(60, abs=1)
+
+    def test_client_error_not_retried(self, rest_extractor, sleeps):
+        session = FakeSession([FakeResponse(404)])
+        with pytest.raises(RuntimeError, match="404"):
+            self.get(rest_extractor, session)
+        assert sleeps == []
+
+    def test_gives_up_after_max_retries(self, rest_extractor, sleeps):
+        session = FakeSession([FakeResponse(500)] * MAX_RETRIES)
+        with pytest.raises(RuntimeError, match="failed after"):
+            self.get(rest_extractor, session)
+        assert len(sleeps) == MAX_RETRIES
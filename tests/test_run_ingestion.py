@@ -0,0 +1,169 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import queue
+import threading
+
+import pandas as pd
+import pytest
+import run_ingestion
+from src.ingestion.db_loader import DatabaseLoader
+from src.ingestion.git_extractor import GitExtractor, parse_github_timestamp
+
+
+def commit_record(i):
+    return {
+        "commit_hash": f"{i:040x}",
+        "author": "dev@example.com",
+        "author_name": "Dev",
+        "timestamp": parse_github_timestamp(f"2024-03-{i + 1:02d}T10:00:00Z"),
+        "message": f"commit {i}",
+        "files_changed": 1,
+        "lines_added": i,
+        "lines_deleted": 0,
+        "total_changes": i,
+        "extracted_at": None,
+    }
+
+
+BATCHES = [[commit_record(0), commit_record(1)], [commit_record(2)], [commit_record(3)]]
+
+
+def failing_batches():
+    yield BATCHES[0]
+    raise RuntimeError("GitHub went away")
+
+
+class FakeExtractor(GitExtractor):
+    batches = BATCHES
+
+    def __init__(self):
+        self.closed = False
+
+    def iter_commit_batches(self, repo_owner, repo_name, max_commits):
+        batches = self.batches
+        return batches() if callable(batches) else iter(batches)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConfigLoader:
+    output_path = None
+
+    def load_main_config(self):
+        return {
+            "data_ingestion": {
+                "repo_owner": "owner",
+                "repo_name": "repo",
+                "max_commits": 10,
+                "raw_data_path": self.output_path,
+            }
+        }
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "logs").mkdir()
+
+    output_path = tmp_path / "raw" / "commits.csv"
+    output_path.parent.mkdir()
+    output_path.write_text("old\n")
+    monkeypatch.setattr(FakeConfigLoader, "output_path", str(output_path))
+    monkeypatch.setattr(run_ingestion, "ConfigLoader", FakeConfigLoader)
+
+    extractors = []
+
+    def make_extractor():
+        extractors.append(FakeExtractor())
+        return extractors[-1]
+
+    monkeypatch.setattr(run_ingestion, "GitExtractor", make_extractor)
+
+    db_loader = DatabaseLoader(f"sqlite:///{tmp_path / 'commits.db'}")
+    db_loader.connect()
+    monkeypatch.setattr(run_ingestion, "connect_database", lambda config_loader: db_loader)
+
+    yield output_path, db_loader, extractors
+    db_loader.close()
+
+
+class TestMain:
+    def test_success_replaces_output_and_loads_database(self, pipeline):
+        output_path, db_loader, extractors = pipeline
+
+        run_ingestion.main()
+
+        df = pd.read_csv(output_path)
+        assert len(df) == 4
+        assert not list(output_path.parent.glob("*.partial*"))
+        assert db_loader.get_record_count() == 4
+        assert extractors[0].closed
+
+    def test_fetch_failure_keeps_old_output_and_database(self, pipeline, monkeypatch):
+        output_path, db_loader, extractors = pipeline
+        monkeypatch.setattr(FakeExtractor, "batches", staticmethod(failing_batches))
+
+        with pytest.raises(RuntimeError, match="GitHub went away"):
+            run_ingestion.main()
+
+        assert output_path.read_text() == "old\n"
+        assert not list(output_path.parent.glob("*.partial*"))
+        db_loader.create_table_if_not_exists()
+        assert db_loader.get_record_count() == 0
+        assert extractors[0].closed
+
+
+class TestProduceConsume:
+    def test_batches_delivered_in_order(self):
+        q = queue.Queue()
+        run_ingestion.produce(iter(BATCHES), [q])
+        assert run_ingestion.consume(q, list) == BATCHES
+
+    def test_failure_sentinel_raises_in_consumer(self):
+        q = queue.Queue()
+        with pytest.raises(RuntimeError, match="GitHub went away"):
+            run_ingestion.produce(failing_batches(), [q])
+
+        with pytest.raises(RuntimeError, match="Commit extraction failed"):
+            run_ingestion.consume(q, list)
+
+    def test_consumer_failure_drains_queue(self):
+        def handler(batches):
+            next(batches)
+            raise ValueError("disk full")
+
+        many = iter([[commit_record(i)] for i in range(20)])
+        q = queue.Queue(maxsize=1)
+        producer = threading.Thread(target=run_ingestion.produce, args=(many, [q]))
+        producer.start()
+
+        with pytest.raises(ValueError):
+            run_ingestion.consume(q, handler)
+
+        producer.join(timeout=5)
+        assert not producer.is_alive()
+        assert q.empty()
+
+
+class TestWriteOutput:
+    def test_failed_write_keeps_old_file(self, tmp_path):
+        output_path = tmp_path / "commits.csv"
+        output_path.write_text("old\n")
+
+        with pytest.raises(RuntimeError):
+            run_ingestion.write_output(FakeExtractor(), failing_batches(), str(output_path))
+
+        assert output_path.read_text() == "old\n"
+        assert list(tmp_path.iterdir()) == [output_path]
+
+    def test_parquet_output_swapped_in(self, tmp_path):
+        output_path = tmp_path / "commits.parquet"
+
+        run_ingestion.write_output(FakeExtractor(), iter(BATCHES), str(output_path))
+
+        assert len(pd.read_parquet(output_path)) == 4
+        assert list(tmp_path.iterdir()) == [output_path]